@@ -24,6 +24,17 @@ Set up the cloud configuration at ``/etc/salt/cloud.providers`` or
       password: JHGhgsayu32jsa
       driver: opennebula
 
+When images, hosts, templates, virtual networks, and the like are looked up
+by name, their pools are cached for ``pool_cache_ttl`` seconds (30 by
+default), so that repeated lookups, such as those made while creating several
+VMs, don't re-query the OpenNebula API. Listing functions such as
+``avail_images`` always query the API. Set ``pool_cache_ttl`` to ``0`` in the
+provider configuration to disable the cache.
+
+While waiting for a new VM to come up, its state is checked every
+``wait_for_ip_interval`` seconds (2 by default). Set
+``wait_for_ip_interval_multiplier`` to grow the interval after each check.
+
 .. note:
 
     Whenever ``data`` is provided as a kwarg to a function and the
@@ -50,7 +61,11 @@ from __future__ import absolute_import
 import logging
 import os
 import pprint
+import random
+import threading
 import time
+from io import BytesIO, DEFAULT_BUFFER_SIZE
+from multiprocessing.pool import ThreadPool
 
 # Import Salt Libs
 import salt.config as config
@@ -62,6 +77,7 @@ from salt.exceptions import (
     SaltCloudSystemExit
 )
 from salt.utils import is_true
+import salt.ext.six as six
 
 # Import Salt Cloud Libs
 import salt.utils.cloud
@@ -74,11 +90,60 @@ try:
 except ImportError:
     HAS_XML_LIBS = False
 
+if HAS_XML_LIBS:
+    # XPath expressions for the fields looked up on every pool element,
+    # compiled once rather than on each lookup. Plain strings are returned so
+    # that the results don't keep the (possibly cleared) elements alive.
+    _XPATH_CPU = etree.XPath('string(TEMPLATE/CPU)', smart_strings=False)
+    _XPATH_ID = etree.XPath('string(ID)', smart_strings=False)
+    _XPATH_LCM_STATE = etree.XPath('string(LCM_STATE)', smart_strings=False)
+    _XPATH_MEMORY = etree.XPath('string(TEMPLATE/MEMORY)', smart_strings=False)
+    _XPATH_NAME = etree.XPath('string(NAME)', smart_strings=False)
+    _XPATH_NIC_IPS = etree.XPath('TEMPLATE/NIC/IP/text()', smart_strings=False)
+    _XPATH_STATE = etree.XPath('string(STATE)', smart_strings=False)
+    _XPATH_TEMPLATE_ID = etree.XPath('string(TEMPLATE/TEMPLATE_ID)',
+                                     smart_strings=False)
+
 # Get Logging Started
 log = logging.getLogger(__name__)
 
 __virtualname__ = 'opennebula'
 
+# The configuration returned by get_configured_provider for each provider name,
+# stored as an (__opts__, configuration) tuple. The configuration is only
+# reused while __opts__ is the very same dictionary.
+_PROVIDER_CACHE = {}
+
+# The xml_rpc setting and the user:password authentication string built by
+# _get_xml_rpc for each provider name, cached the same way as _PROVIDER_CACHE.
+_XML_RPC_CONFIG = {}
+
+# The update types accepted by the *_update functions, mapped to the number
+# the OpenNebula API expects.
+_UPDATE_TYPES = {'replace': 0, 'merge': 1}
+
+# Parsed OpenNebula pools, keyed by provider and pool name. Each entry is a
+# (timestamp, pool, pool indexed by ID) tuple. See _get_pool.
+_POOL_CACHE = {}
+
+# XML-RPC connections to the OpenNebula API, keyed by URL. The ServerProxy's
+# transport keeps its HTTP connection alive between requests, so reusing it
+# saves a TCP (and TLS) handshake on every call. A ServerProxy can't be shared
+# between threads, so each thread keeps its own. See _get_xml_rpc.
+_XML_RPC_SERVERS = threading.local()
+
+# The tag of the elements contained in each OpenNebula pool.
+_POOL_ELEMENTS = {
+    'clusterpool': 'CLUSTER',
+    'datastorepool': 'DATASTORE',
+    'hostpool': 'HOST',
+    'imagepool': 'IMAGE',
+    'secgrouppool': 'SECURITY_GROUP',
+    'templatepool': 'VMTEMPLATE',
+    'vmpool': 'VM',
+    'vnpool': 'VNET',
+}
+
 
 def __virtual__():
     '''
@@ -97,11 +162,19 @@ def get_configured_provider():
     '''
     Return the first configured instance.
     '''
-    return config.is_provider_configured(
+    provider = __active_provider_name__ or __virtualname__
+    cached = _PROVIDER_CACHE.get(provider)
+    if cached is not None and cached[0] is __opts__:
+        return cached[1]
+
+    ret = config.is_provider_configured(
         __opts__,
-        __active_provider_name__ or __virtualname__,
+        provider,
         ('xml_rpc', 'user', 'password')
     )
+    _PROVIDER_CACHE[provider] = (__opts__, ret)
+
+    return ret
 
 
 def get_dependencies():
@@ -133,15 +206,7 @@ def avail_images(call=None):
             '-f or --function, or with the --list-images option'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
-    image_pool = server.one.imagepool.info(auth, -1, -1, -1)[1]
-
-    images = {}
-    for image in etree.XML(image_pool):
-        images[image.find('NAME').text] = _xml_to_dict(image)
-
-    return images
+    return _query_pool('imagepool', -1, -1, -1)
 
 
 def avail_locations(call=None):
@@ -163,15 +228,7 @@ def avail_locations(call=None):
             '-f or --function, or with the --list-locations option.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
-    host_pool = server.one.hostpool.info(auth)[1]
-
-    locations = {}
-    for host in etree.XML(host_pool):
-        locations[host.find('NAME').text] = _xml_to_dict(host)
-
-    return locations
+    return _query_pool('hostpool')
 
 
 def avail_sizes(call=None):
@@ -210,15 +267,7 @@ def list_clusters(call=None):
             'The list_clusters function must be called with -f or --function.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
-    cluster_pool = server.one.clusterpool.info(auth)[1]
-
-    clusters = {}
-    for cluster in etree.XML(cluster_pool):
-        clusters[cluster.find('NAME').text] = _xml_to_dict(cluster)
-
-    return clusters
+    return _query_pool('clusterpool')
 
 
 def list_datastores(call=None):
@@ -238,15 +287,7 @@ def list_datastores(call=None):
             'The list_datastores function must be called with -f or --function.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
-    datastore_pool = server.one.datastorepool.info(auth)[1]
-
-    datastores = {}
-    for datastore in etree.XML(datastore_pool):
-        datastores[datastore.find('NAME').text] = _xml_to_dict(datastore)
-
-    return datastores
+    return _query_pool('datastorepool')
 
 
 def list_hosts(call=None):
@@ -344,15 +385,7 @@ def list_security_groups(call=None):
             'The list_security_groups function must be called with -f or --function.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
-    secgroup_pool = server.one.secgrouppool.info(auth, -1, -1, -1)[1]
-
-    groups = {}
-    for group in etree.XML(secgroup_pool):
-        groups[group.find('NAME').text] = _xml_to_dict(group)
-
-    return groups
+    return _query_pool('secgrouppool', -1, -1, -1)
 
 
 def list_templates(call=None):
@@ -372,15 +405,7 @@ def list_templates(call=None):
             'The list_templates function must be called with -f or --function.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
-    template_pool = server.one.templatepool.info(auth, -1, -1, -1)[1]
-
-    templates = {}
-    for template in etree.XML(template_pool):
-        templates[template.find('NAME').text] = _xml_to_dict(template)
-
-    return templates
+    return _query_pool('templatepool', -1, -1, -1)
 
 
 def list_vns(call=None):
@@ -400,15 +425,7 @@ def list_vns(call=None):
             'The list_vns function must be called with -f or --function.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
-    vn_pool = server.one.vnpool.info(auth, -1, -1, -1)[1]
-
-    vns = {}
-    for v_network in etree.XML(vn_pool):
-        vns[v_network.find('NAME').text] = _xml_to_dict(v_network)
-
-    return vns
+    return _query_pool('vnpool', -1, -1, -1)
 
 
 def reboot(name, call=None):
@@ -431,7 +448,7 @@ def reboot(name, call=None):
             'The start action must be called with -a or --action.'
         )
 
-    log.info('Rebooting node {0}'.format(name))
+    log.info('Rebooting node %s', name)
 
     return vm_action(name, kwargs={'action': 'reboot'}, call=call)
 
@@ -456,7 +473,7 @@ def start(name, call=None):
             'The start action must be called with -a or --action.'
         )
 
-    log.info('Starting node {0}'.format(name))
+    log.info('Starting node %s', name)
 
     return vm_action(name, kwargs={'action': 'resume'}, call=call)
 
@@ -481,7 +498,7 @@ def stop(name, call=None):
             'The start action must be called with -a or --action.'
         )
 
-    log.info('Stopping node {0}'.format(name))
+    log.info('Stopping node %s', name)
 
     return vm_action(name, kwargs={'action': 'stop'}, call=call)
 
@@ -512,9 +529,8 @@ def get_cluster_id(kwargs=None, call=None):
             'The get_cluster_id function requires a name.'
         )
 
-    try:
-        ret = list_clusters()[name]['id']
-    except KeyError:
+    ret = _get_pool_id('clusterpool', name)
+    if ret is None:
         raise SaltCloudSystemExit(
             'The cluster \'{0}\' could not be found'.format(name)
         )
@@ -548,9 +564,8 @@ def get_datastore_id(kwargs=None, call=None):
             'The get_datastore_id function requires a name.'
         )
 
-    try:
-        ret = list_datastores()[name]['id']
-    except KeyError:
+    ret = _get_pool_id('datastorepool', name)
+    if ret is None:
         raise SaltCloudSystemExit(
             'The datastore \'{0}\' could not be found.'.format(name)
         )
@@ -584,9 +599,8 @@ def get_host_id(kwargs=None, call=None):
             'The get_host_id function requires a name.'
         )
 
-    try:
-        ret = avail_locations()[name]['id']
-    except KeyError:
+    ret = _get_pool_id('hostpool', name)
+    if ret is None:
         raise SaltCloudSystemExit(
             'The host \'{0}\' could not be found'.format(name)
         )
@@ -601,13 +615,14 @@ def get_image(vm_):
     vm\_
         The VM dictionary for which to obtain an image.
     '''
-    images = avail_images()
     vm_image = str(config.get_cloud_config_value(
         'image', vm_, __opts__, search_global=False
     ))
-    for image in images:
-        if vm_image in (images[image]['name'], images[image]['id']):
-            return images[image]['id']
+    image = _get_pool_element(
+        'imagepool', _get_pool('imagepool', -1, -1, -1), vm_image
+    )
+    if image is not None:
+        return image['id']
     raise SaltCloudNotFound(
         'The specified image, \'{0}\', could not be found.'.format(vm_image)
     )
@@ -639,9 +654,8 @@ def get_image_id(kwargs=None, call=None):
             'The get_image_id function requires a name.'
         )
 
-    try:
-        ret = avail_images()[name]['id']
-    except KeyError:
+    ret = _get_pool_id('imagepool', name, -1, -1, -1)
+    if ret is None:
         raise SaltCloudSystemExit(
             'The image \'{0}\' could not be found'.format(name)
         )
@@ -656,7 +670,6 @@ def get_location(vm_):
     vm\_
         The VM dictionary for which to obtain a location.
     '''
-    locations = avail_locations()
     vm_location = str(config.get_cloud_config_value(
         'location', vm_, __opts__, search_global=False
     ))
@@ -664,10 +677,9 @@ def get_location(vm_):
     if vm_location == 'None':
         return None
 
-    for location in locations:
-        if vm_location in (locations[location]['name'],
-                           locations[location]['id']):
-            return locations[location]['id']
+    location = _get_pool_element('hostpool', _get_pool('hostpool'), vm_location)
+    if location is not None:
+        return location['id']
     raise SaltCloudNotFound(
         'The specified location, \'{0}\', could not be found.'.format(
             vm_location
@@ -701,9 +713,8 @@ def get_secgroup_id(kwargs=None, call=None):
             'The get_secgroup_id function requires a \'name\'.'
         )
 
-    try:
-        ret = list_security_groups()[name]['id']
-    except KeyError:
+    ret = _get_pool_id('secgrouppool', name, -1, -1, -1)
+    if ret is None:
         raise SaltCloudSystemExit(
             'The security group \'{0}\' could not be found.'.format(name)
         )
@@ -737,9 +748,8 @@ def get_template_id(kwargs=None, call=None):
             'The get_template_id function requires a \'name\'.'
         )
 
-    try:
-        ret = list_templates()[name]['id']
-    except KeyError:
+    ret = _get_pool_id('templatepool', name, -1, -1, -1)
+    if ret is None:
         raise SaltCloudSystemExit(
             'The template \'{0}\' could not be foound.'.format(name)
         )
@@ -760,13 +770,14 @@ def get_template(vm_):
     vm_template = str(config.get_cloud_config_value(
         'template', vm_, __opts__, search_global=False
     ))
-    try:
-        return list_templates()[vm_template]['id']
-    except KeyError:
+    template_id = _get_pool_id('templatepool', vm_template, -1, -1, -1)
+    if template_id is None:
         raise SaltCloudNotFound(
             'The specified template, \'{0}\', could not be found.'.format(vm_template)
         )
 
+    return template_id
+
 
 def get_vm_id(kwargs=None, call=None):
     '''
@@ -794,9 +805,8 @@ def get_vm_id(kwargs=None, call=None):
             'The get_vm_id function requires a name.'
         )
 
-    try:
-        ret = list_nodes()[name]['id']
-    except KeyError:
+    ret = _get_pool_id('vmpool', name, -1, -1, -1, -1)
+    if ret is None:
         raise SaltCloudSystemExit(
             'The VM \'{0}\' could not be found.'.format(name)
         )
@@ -830,9 +840,8 @@ def get_vn_id(kwargs=None, call=None):
             'The get_vn_id function requires a name.'
         )
 
-    try:
-        ret = list_vns()[name]['id']
-    except KeyError:
+    ret = _get_pool_id('vnpool', name, -1, -1, -1)
+    if ret is None:
         raise SaltCloudSystemExit(
             'The VN \'{0}\' could not be found.'.format(name)
         )
@@ -880,7 +889,16 @@ def create(vm_):
         transport=__opts__['transport']
     )
 
-    log.info('Creating Cloud VM {0}'.format(vm_['name']))
+    log.info('Creating Cloud VM %s', vm_['name'])
+
+    # Fetch the pools needed to look up the template and location in a single
+    # round trip, rather than one for each lookup.
+    pools = [('templatepool', -1, -1, -1)]
+    if config.get_cloud_config_value('location', vm_, __opts__,
+                                     search_global=False) is not None:
+        pools.append(('hostpool',))
+    _prefetch_pools(*pools)
+
     kwargs = {
         'name': vm_['name'],
         'template_id': get_template(vm_),
@@ -901,12 +919,12 @@ def create(vm_):
         {'kwargs': kwargs},
     )
 
-    region = ''
-    if kwargs['region_id'] is not None:
-        region = 'SCHED_REQUIREMENTS="ID={0}"'.format(kwargs['region_id'])
+    if kwargs['region_id'] is None:
+        region = ''
+    else:
+        region = 'SCHED_REQUIREMENTS="ID=%s"' % kwargs['region_id']
     try:
-        server, user, password = _get_xml_rpc()
-        auth = ':'.join([user, password])
+        server, auth = _get_xml_rpc()
         cret = server.one.template.instantiate(auth,
                                         int(kwargs['template_id']),
                                         kwargs['name'],
@@ -941,24 +959,33 @@ def create(vm_):
     if fqdn is not None:
         fqdn = '{0}.{1}'.format(vm_['name'], fqdn)
 
-    def __query_node_data(vm_name):
-        node_data = show_instance(vm_name, call='action')
-        if not node_data:
+    def __query_node_data(vm_id):
+        # Only query the new VM, and only look at its state until it's
+        # running, rather than converting the whole VM pool on every poll.
+        response = server.one.vm.info(auth, vm_id)
+        if not response[0]:
             # Trigger an error in the wait_for_ip function
             return False
-        if node_data['state'] == '7':
+        tree = _parse_xml(response[1])
+        if _XPATH_STATE(tree) == '7':
             return False
-        if node_data['lcm_state'] == '3':
+        if _XPATH_LCM_STATE(tree) == '3':
+            node_data = _xml_to_dict(tree)
+            salt.utils.cloud.cache_node(
+                node_data, __active_provider_name__, __opts__
+            )
             return node_data
 
     try:
         data = salt.utils.cloud.wait_for_ip(
             __query_node_data,
-            update_args=(vm_['name'],),
+            update_args=(int(cret[1]),),
             timeout=config.get_cloud_config_value(
                 'wait_for_ip_timeout', vm_, __opts__, default=10 * 60),
             interval=config.get_cloud_config_value(
                 'wait_for_ip_interval', vm_, __opts__, default=2),
+            interval_multiplier=config.get_cloud_config_value(
+                'wait_for_ip_interval_multiplier', vm_, __opts__, default=1),
         )
     except (SaltCloudExecutionTimeout, SaltCloudExecutionFailure) as exc:
         try:
@@ -1006,12 +1033,12 @@ def create(vm_):
     ret['private_ips'] = private_ip
     ret['public_ips'] = []
 
-    log.info('Created Cloud VM \'{0[name]}\''.format(vm_))
-    log.debug(
-        '\'{0[name]}\' VM creation details:\n{1}'.format(
-            vm_, pprint.pformat(data)
+    log.info('Created Cloud VM \'%s\'', vm_['name'])
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug(
+            '\'%s\' VM creation details:\n%s',
+            vm_['name'], pprint.pformat(data)
         )
-    )
 
     salt.utils.cloud.fire_event(
         'event',
@@ -1057,8 +1084,7 @@ def destroy(name, call=None):
         {'name': name},
     )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
 
     data = show_instance(name, call='action')
     node = server.one.vm.action(auth, 'delete', int(data['id']))
@@ -1153,16 +1179,17 @@ def image_allocate(call=None, kwargs=None):
                 '\'data\' will take precedence.'
             )
     elif path:
-        data = salt.utils.fopen(path, mode='r').read()
+        data = _read_template_file(path)
     else:
         raise SaltCloudSystemExit(
             'The image_allocate function requires either a file \'path\' or \'data\' '
             'to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.image.allocate(auth, data, int(datastore_id))
+    if response[0]:
+        _clear_pool_cache('imagepool')
 
     ret = {
         'action': 'image.allocate',
@@ -1227,9 +1254,10 @@ def image_clone(call=None, kwargs=None):
             '\'image_name\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.image.clone(auth, int(image_id), name)
+    if response[0]:
+        _clear_pool_cache('imagepool')
 
     data = {
         'action': 'image.clone',
@@ -1287,9 +1315,10 @@ def image_delete(call=None, kwargs=None):
             '\'name\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.image.delete(auth, int(image_id))
+    if response[0]:
+        _clear_pool_cache('imagepool')
 
     data = {
         'action': 'image.delete',
@@ -1348,13 +1377,12 @@ def image_info(call=None, kwargs=None):
             'to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
 
     info = {}
     response = server.one.image.info(auth, int(image_id))[1]
-    tree = etree.XML(response)
-    info[tree.find('NAME').text] = _xml_to_dict(tree)
+    tree = _parse_xml(response)
+    info[_XPATH_NAME(tree)] = _xml_to_dict(tree)
 
     return info
 
@@ -1414,8 +1442,7 @@ def image_persistent(call=None, kwargs=None):
             '\'image_id\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.image.persistent(auth, int(image_id), is_true(persist))
 
     data = {
@@ -1483,8 +1510,7 @@ def image_snapshot_delete(call=None, kwargs=None):
             'or a \'image_name\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.image.snapshotdelete(auth, int(image_id), int(snapshot_id))
 
     data = {
@@ -1550,8 +1576,7 @@ def image_snapshot_revert(call=None, kwargs=None):
             'an \'image_name\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.image.snapshotrevert(auth, int(image_id), int(snapshot_id))
 
     data = {
@@ -1618,8 +1643,7 @@ def image_snapshot_flatten(call=None, kwargs=None):
             '\'image_id\' or an \'image_name\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.image.snapshotflatten(auth, int(image_id), int(snapshot_id))
 
     data = {
@@ -1678,23 +1702,16 @@ def image_update(call=None, kwargs=None):
     path = kwargs.get('path', None)
     data = kwargs.get('data', None)
     update_type = kwargs.get('update_type', None)
-    update_args = ['replace', 'merge']
 
     if update_type is None:
         raise SaltCloudSystemExit(
             'The image_update function requires an \'update_type\' to be provided.'
         )
 
-    if update_type == update_args[0]:
-        update_number = 0
-    elif update_type == update_args[1]:
-        update_number = 1
-    else:
+    update_number = _UPDATE_TYPES.get(update_type)
+    if update_number is None:
         raise SaltCloudSystemExit(
-            'The update_type argument must be either {0} or {1}.'.format(
-                update_args[0],
-                update_args[1]
-            )
+            'The update_type argument must be either replace or merge.'
         )
 
     if image_id:
@@ -1718,15 +1735,14 @@ def image_update(call=None, kwargs=None):
                 '\'data\' will take precedence.'
             )
     elif path:
-        data = salt.utils.fopen(path, mode='r').read()
+        data = _read_template_file(path)
     else:
         raise SaltCloudSystemExit(
             'The image_update function requires either \'data\' or a file \'path\' '
             'to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.image.update(auth, int(image_id), data, int(update_number))
 
     ret = {
@@ -1810,16 +1826,17 @@ def secgroup_allocate(call=None, kwargs=None):
                 '\'data\' will take precedence.'
             )
     elif path:
-        data = salt.utils.fopen(path, mode='r').read()
+        data = _read_template_file(path)
     else:
         raise SaltCloudSystemExit(
             'The secgroup_allocate function requires either \'data\' or a file '
             '\'path\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.secgroup.allocate(auth, data)
+    if response[0]:
+        _clear_pool_cache('secgrouppool')
 
     ret = {
         'action': 'secgroup.allocate',
@@ -1886,9 +1903,10 @@ def secgroup_clone(call=None, kwargs=None):
             '\'secgroup_name\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.secgroup.clone(auth, int(secgroup_id), name)
+    if response[0]:
+        _clear_pool_cache('secgrouppool')
 
     data = {
         'action': 'secgroup.clone',
@@ -1947,9 +1965,10 @@ def secgroup_delete(call=None, kwargs=None):
             '\'secgroup_id\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.secgroup.delete(auth, int(secgroup_id))
+    if response[0]:
+        _clear_pool_cache('secgrouppool')
 
     data = {
         'action': 'secgroup.delete',
@@ -2008,13 +2027,12 @@ def secgroup_info(call=None, kwargs=None):
             'to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
 
     info = {}
     response = server.one.secgroup.info(auth, int(secgroup_id))[1]
-    tree = etree.XML(response)
-    info[tree.find('NAME').text] = _xml_to_dict(tree)
+    tree = _parse_xml(response)
+    info[_XPATH_NAME(tree)] = _xml_to_dict(tree)
 
     return info
 
@@ -2069,23 +2087,15 @@ def secgroup_update(call=None, kwargs=None):
     path = kwargs.get('path', None)
     data = kwargs.get('data', None)
     update_type = kwargs.get('update_type', None)
-    update_args = ['replace', 'merge']
-
     if update_type is None:
         raise SaltCloudSystemExit(
             'The secgroup_update function requires an \'update_type\' to be provided.'
         )
 
-    if update_type == update_args[0]:
-        update_number = 0
-    elif update_type == update_args[1]:
-        update_number = 1
-    else:
+    update_number = _UPDATE_TYPES.get(update_type)
+    if update_number is None:
         raise SaltCloudSystemExit(
-            'The update_type argument must be either {0} or {1}.'.format(
-                update_args[0],
-                update_args[1]
-            )
+            'The update_type argument must be either replace or merge.'
         )
 
     if secgroup_id:
@@ -2109,15 +2119,14 @@ def secgroup_update(call=None, kwargs=None):
                 '\'data\' will take precedence.'
             )
     elif path:
-        data = salt.utils.fopen(path, mode='r').read()
+        data = _read_template_file(path)
     else:
         raise SaltCloudSystemExit(
             'The secgroup_update function requires either \'data\' or a file \'path\' '
             'to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.secgroup.update(auth, int(secgroup_id), data, int(update_number))
 
     ret = {
@@ -2174,16 +2183,17 @@ def template_allocate(call=None, kwargs=None):
                 '\'data\' will take precedence.'
             )
     elif path:
-        data = salt.utils.fopen(path, mode='r').read()
+        data = _read_template_file(path)
     else:
         raise SaltCloudSystemExit(
             'The template_allocate function requires either \'data\' or a file '
             '\'path\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.template.allocate(auth, data)
+    if response[0]:
+        _clear_pool_cache('templatepool')
 
     ret = {
         'action': 'template.allocate',
@@ -2248,10 +2258,11 @@ def template_clone(call=None, kwargs=None):
             'or a \'template_name\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
 
     response = server.one.template.clone(auth, int(template_id), name)
+    if response[0]:
+        _clear_pool_cache('templatepool')
 
     data = {
         'action': 'template.clone',
@@ -2309,9 +2320,10 @@ def template_delete(call=None, kwargs=None):
             'to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.template.delete(auth, int(template_id))
+    if response[0]:
+        _clear_pool_cache('templatepool')
 
     data = {
         'action': 'template.delete',
@@ -2383,8 +2395,7 @@ def template_instantiate(call=None, kwargs=None):
             'or a \'template_name\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.template.instantiate(auth, int(template_id), vm_name)
 
     data = {
@@ -2448,23 +2459,15 @@ def template_update(call=None, kwargs=None):
     path = kwargs.get('path', None)
     data = kwargs.get('data', None)
     update_type = kwargs.get('update_type', None)
-    update_args = ['replace', 'merge']
-
     if update_type is None:
         raise SaltCloudSystemExit(
             'The template_update function requires an \'update_type\' to be provided.'
         )
 
-    if update_type == update_args[0]:
-        update_number = 0
-    elif update_type == update_args[1]:
-        update_number = 1
-    else:
+    update_number = _UPDATE_TYPES.get(update_type)
+    if update_number is None:
         raise SaltCloudSystemExit(
-            'The update_type argument must be either {0} or {1}.'.format(
-                update_args[0],
-                update_args[1]
-            )
+            'The update_type argument must be either replace or merge.'
         )
 
     if template_id:
@@ -2488,15 +2491,14 @@ def template_update(call=None, kwargs=None):
                 '\'data\' will take precedence.'
             )
     elif path:
-        data = salt.utils.fopen(path, mode='r').read()
+        data = _read_template_file(path)
     else:
         raise SaltCloudSystemExit(
             'The template_update function requires either \'data\' or a file '
             '\'path\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.template.update(auth, int(template_id), data, int(update_number))
 
     ret = {
@@ -2559,8 +2561,7 @@ def vm_action(name, kwargs=None, call=None):
             'The vm_action function must have an \'action\' provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     vm_id = int(get_vm_id(kwargs={'name': name}))
     response = server.one.vm.action(auth, action, vm_id)
 
@@ -2620,15 +2621,14 @@ def vm_allocate(call=None, kwargs=None):
                 '\'data\' will take precedence.'
             )
     elif path:
-        data = salt.utils.fopen(path, mode='r').read()
+        data = _read_template_file(path)
     else:
         raise SaltCloudSystemExit(
             'The vm_allocate function requires either \'data\' or a file \'path\' '
             'to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.vm.allocate(auth, data, is_true(hold))
 
     ret = {
@@ -2685,15 +2685,14 @@ def vm_attach(name, kwargs=None, call=None):
                 '\'data\' will take precedence.'
             )
     elif path:
-        data = salt.utils.fopen(path, mode='r').read()
+        data = _read_template_file(path)
     else:
         raise SaltCloudSystemExit(
             'The vm_attach function requires either \'data\' or a file '
             '\'path\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     vm_id = int(get_vm_id(kwargs={'name': name}))
     response = server.one.vm.attach(auth, vm_id, data)
 
@@ -2751,15 +2750,14 @@ def vm_attach_nic(name, kwargs=None, call=None):
                 '\'data\' will take precedence.'
             )
     elif path:
-        data = salt.utils.fopen(path, mode='r').read()
+        data = _read_template_file(path)
     else:
         raise SaltCloudSystemExit(
             'The vm_attach_nic function requires either \'data\' or a file '
             '\'path\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     vm_id = int(get_vm_id(kwargs={'name': name}))
     response = server.one.vm.attachnic(auth, vm_id, data)
 
@@ -2853,8 +2851,7 @@ def vm_deploy(name, kwargs=None, call=None):
     else:
         datastore_id = '-1'
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     vm_id = get_vm_id(kwargs={'name': name})
     response = server.one.vm.deploy(auth,
                                     int(vm_id),
@@ -2904,8 +2901,7 @@ def vm_detach(name, kwargs=None, call=None):
             'The vm_detach function requires a \'disk_id\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     vm_id = int(get_vm_id(kwargs={'name': name}))
     response = server.one.vm.detach(auth, vm_id, int(disk_id))
 
@@ -2951,8 +2947,7 @@ def vm_detach_nic(name, kwargs=None, call=None):
             'The vm_detach_nic function requires a \'nic_id\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     vm_id = int(get_vm_id(kwargs={'name': name}))
     response = server.one.vm.detachnic(auth, vm_id, int(nic_id))
 
@@ -3016,8 +3011,7 @@ def vm_disk_save(name, kwargs=None, call=None):
             'to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     vm_id = int(get_vm_id(kwargs={'name': name}))
     response = server.one.vm.disksave(auth,
                                       vm_id,
@@ -3025,6 +3019,8 @@ def vm_disk_save(name, kwargs=None, call=None):
                                       image_name,
                                       image_type,
                                       snapshot_id)
+    if response[0]:
+        _clear_pool_cache('imagepool')
 
     data = {
         'action': 'vm.disksave',
@@ -3074,8 +3070,7 @@ def vm_disk_snapshot_create(name, kwargs=None, call=None):
             'to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     vm_id = int(get_vm_id(kwargs={'name': name}))
     response = server.one.vm.disksnapshotcreate(auth,
                                                 vm_id,
@@ -3130,8 +3125,7 @@ def vm_disk_snapshot_delete(name, kwargs=None, call=None):
             'to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     vm_id = int(get_vm_id(kwargs={'name': name}))
     response = server.one.vm.disksnapshotdelete(auth,
                                                 vm_id,
@@ -3186,8 +3180,7 @@ def vm_disk_snapshot_revert(name, kwargs=None, call=None):
             'to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     vm_id = int(get_vm_id(kwargs={'name': name}))
     response = server.one.vm.disksnapshotrevert(auth,
                                                 vm_id,
@@ -3224,8 +3217,7 @@ def vm_info(name, call=None):
             'The vm_info action must be called with -a or --action.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     vm_id = int(get_vm_id(kwargs={'name': name}))
     response = server.one.vm.info(auth, vm_id)
 
@@ -3233,8 +3225,8 @@ def vm_info(name, call=None):
         return response[1]
     else:
         info = {}
-        tree = etree.XML(response[1])
-        info[tree.find('NAME').text] = _xml_to_dict(tree)
+        tree = _parse_xml(response[1])
+        info[_XPATH_NAME(tree)] = _xml_to_dict(tree)
         return info
 
 
@@ -3322,8 +3314,7 @@ def vm_migrate(name, kwargs=None, call=None):
             'or a \'host_name\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     vm_id = int(get_vm_id(kwargs={'name': name}))
     response = server.one.vm.migrate(auth,
                                      vm_id,
@@ -3367,8 +3358,7 @@ def vm_monitoring(name, call=None):
             'The vm_monitoring action must be called with -a or --action.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     vm_id = int(get_vm_id(kwargs={'name': name}))
     response = server.one.vm.monitoring(auth, vm_id)
 
@@ -3380,8 +3370,8 @@ def vm_monitoring(name, call=None):
         return {}
     else:
         info = {}
-        for vm_ in etree.XML(response[1]):
-            info[vm_.find('ID').text] = _xml_to_dict(vm_)
+        for vm_ in _iter_pool(response[1], 'VM'):
+            info[_XPATH_ID(vm_)] = _xml_to_dict(vm_)
         return info
 
 
@@ -3437,15 +3427,14 @@ def vm_resize(name, kwargs=None, call=None):
                 '\'data\' will take precedence.'
             )
     elif path:
-        data = salt.utils.fopen(path, mode='r').read()
+        data = _read_template_file(path)
     else:
         raise SaltCloudSystemExit(
             'The vm_resize function requires either \'data\' or a file \'path\' '
             'to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     vm_id = int(get_vm_id(kwargs={'name': name}))
     response = server.one.vm.resize(auth, vm_id, data, is_true(capacity_maintained))
 
@@ -3491,8 +3480,7 @@ def vm_snapshot_create(vm_name, kwargs=None, call=None):
             'The vm_snapshot_create function requires a \'snapshot_name\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     vm_id = int(get_vm_id(kwargs={'name': vm_name}))
     response = server.one.vm.snapshotcreate(auth, vm_id, snapshot_name)
 
@@ -3538,8 +3526,7 @@ def vm_snapshot_delete(vm_name, kwargs=None, call=None):
             'The vm_snapshot_delete function requires a \'snapshot_id\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     vm_id = int(get_vm_id(kwargs={'name': vm_name}))
     response = server.one.vm.snapshotdelete(auth, vm_id, int(snapshot_id))
 
@@ -3585,8 +3572,7 @@ def vm_snapshot_revert(vm_name, kwargs=None, call=None):
             'The vm_snapshot_revert function requires a \'snapshot_id\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     vm_id = int(get_vm_id(kwargs={'name': vm_name}))
     response = server.one.vm.snapshotrevert(auth, vm_id, int(snapshot_id))
 
@@ -3638,23 +3624,15 @@ def vm_update(name, kwargs=None, call=None):
     path = kwargs.get('path', None)
     data = kwargs.get('data', None)
     update_type = kwargs.get('update_type', None)
-    update_args = ['replace', 'merge']
-
     if update_type is None:
         raise SaltCloudSystemExit(
             'The vm_update function requires an \'update_type\' to be provided.'
         )
 
-    if update_type == update_args[0]:
-        update_number = 0
-    elif update_type == update_args[1]:
-        update_number = 1
-    else:
+    update_number = _UPDATE_TYPES.get(update_type)
+    if update_number is None:
         raise SaltCloudSystemExit(
-            'The update_type argument must be either {0} or {1}.'.format(
-                update_args[0],
-                update_args[1]
-            )
+            'The update_type argument must be either replace or merge.'
         )
 
     if data:
@@ -3664,15 +3642,14 @@ def vm_update(name, kwargs=None, call=None):
                 '\'data\' will take precedence.'
             )
     elif path:
-        data = salt.utils.fopen(path, mode='r').read()
+        data = _read_template_file(path)
     else:
         raise SaltCloudSystemExit(
             'The vm_update function requires either \'data\' or a file \'path\' '
             'to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     vm_id = int(get_vm_id(kwargs={'name': name}))
     response = server.one.vm.update(auth, vm_id, data, int(update_number))
 
@@ -3751,15 +3728,14 @@ def vn_add_ar(call=None, kwargs=None):
                 '\'data\' will take precedence.'
             )
     elif path:
-        data = salt.utils.fopen(path, mode='r').read()
+        data = _read_template_file(path)
     else:
         raise SaltCloudSystemExit(
             'The vn_add_ar function requires either \'data\' or a file \'path\' '
             'to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.vn.add_ar(auth, int(vn_id), data)
 
     ret = {
@@ -3823,7 +3799,7 @@ def vn_allocate(call=None, kwargs=None):
                 '\'data\' will take precedence.'
             )
     elif path:
-        data = salt.utils.fopen(path, mode='r').read()
+        data = _read_template_file(path)
     else:
         raise SaltCloudSystemExit(
             'The vn_allocate function requires either \'data\' or a file \'path\' '
@@ -3841,9 +3817,10 @@ def vn_allocate(call=None, kwargs=None):
     else:
         cluster_id = '-1'
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.vn.allocate(auth, data, int(cluster_id))
+    if response[0]:
+        _clear_pool_cache('vnpool')
 
     ret = {
         'action': 'vn.allocate',
@@ -3900,9 +3877,10 @@ def vn_delete(call=None, kwargs=None):
             'to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.vn.delete(auth, int(vn_id))
+    if response[0]:
+        _clear_pool_cache('vnpool')
 
     data = {
         'action': 'vn.delete',
@@ -3969,8 +3947,7 @@ def vn_free_ar(call=None, kwargs=None):
             'be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.vn.free_ar(auth, int(vn_id), int(ar_id))
 
     data = {
@@ -4047,15 +4024,14 @@ def vn_hold(call=None, kwargs=None):
                 '\'data\' will take precedence.'
             )
     elif path:
-        data = salt.utils.fopen(path, mode='r').read()
+        data = _read_template_file(path)
     else:
         raise SaltCloudSystemExit(
             'The vn_hold function requires either \'data\' or a \'path\' to '
             'be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.vn.hold(auth, int(vn_id), data)
 
     ret = {
@@ -4114,16 +4090,15 @@ def vn_info(call=None, kwargs=None):
             'to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.vn.info(auth, int(vn_id))
 
     if response[0] is False:
         return response[1]
     else:
         info = {}
-        tree = etree.XML(response[1])
-        info[tree.find('NAME').text] = _xml_to_dict(tree)
+        tree = _parse_xml(response[1])
+        info[_XPATH_NAME(tree)] = _xml_to_dict(tree)
         return info
 
 
@@ -4191,15 +4166,14 @@ def vn_release(call=None, kwargs=None):
                 '\'data\' will take precedence.'
             )
     elif path:
-        data = salt.utils.fopen(path, mode='r').read()
+        data = _read_template_file(path)
     else:
         raise SaltCloudSystemExit(
             'The vn_release function requires either \'data\' or a \'path\' to '
             'be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.vn.release(auth, int(vn_id), data)
 
     ret = {
@@ -4277,15 +4251,16 @@ def vn_reserve(call=None, kwargs=None):
                 '\'data\' will take precedence.'
             )
     elif path:
-        data = salt.utils.fopen(path, mode='r').read()
+        data = _read_template_file(path)
     else:
         raise SaltCloudSystemExit(
             'The vn_reserve function requires a \'path\' to be provided.'
         )
 
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
     response = server.one.vn.reserve(auth, int(vn_id), data)
+    if response[0]:
+        _clear_pool_cache('vnpool')
 
     ret = {
         'action': 'vn.reserve',
@@ -4299,6 +4274,69 @@ def vn_reserve(call=None, kwargs=None):
 
 # Helper Functions
 
+def _cache_pool(pool, xml):
+    '''
+    Helper function that parses the xml data of an OpenNebula pool into a
+    dictionary keyed by name, and stores it in the pool cache.
+
+    pool
+        The name of the pool, such as ``imagepool``.
+
+    xml
+        The xml data returned by the pool's ``info`` call.
+    '''
+    elements = _parse_pool(pool, xml)
+    ids = dict(
+        (element['id'], element) for element in six.itervalues(elements)
+    )
+
+    _POOL_CACHE[(__active_provider_name__, pool)] = (time.time(), elements, ids)
+
+    return elements
+
+
+def _clear_pool_cache(*pools):
+    '''
+    Helper function that drops the given pools from the pool cache, so that
+    the next lookup queries the OpenNebula API again.
+
+    pools
+        The names of the pools to drop, such as ``imagepool``.
+    '''
+    for pool in pools:
+        _POOL_CACHE.pop((__active_provider_name__, pool), None)
+
+
+def _fetch_pool(pool):
+    '''
+    Helper function that queries an OpenNebula pool and returns the raw
+    response, bypassing the pool cache.
+
+    pool
+        A tuple of the pool name followed by the arguments to pass to the
+        pool's ``info`` call, such as ``('imagepool', -1, -1, -1)``.
+    '''
+    server, auth = _get_xml_rpc()
+
+    return getattr(server.one, pool[0]).info(auth, *pool[1:])
+
+
+def _get_cached_pool(pool):
+    '''
+    Helper function that returns the cached contents of an OpenNebula pool, or
+    ``None`` if the pool isn't cached or has been cached for longer than
+    ``pool_cache_ttl`` seconds.
+
+    pool
+        The name of the pool, such as ``imagepool``.
+    '''
+    cached = _POOL_CACHE.get((__active_provider_name__, pool))
+    if cached is not None and time.time() - cached[0] < _get_pool_cache_ttl():
+        return cached[1]
+
+    return None
+
+
 def _get_node(name):
     '''
     Helper function that returns all information about a named node.
@@ -4306,24 +4344,130 @@ def _get_node(name):
     name
         The name of the node for which to get information.
     '''
-    attempts = 10
+    # Each attempt fetches the VM pool, so only retry a couple of times in
+    # case the node isn't listed yet, and don't wait after the last attempt.
+    attempts = 2
+    delay = 0.5
 
-    while attempts >= 0:
-        try:
-            return list_nodes_full()[name]
-        except KeyError:
-            attempts -= 1
-            log.debug(
-                'Failed to get the data for node \'{0}\'. Remaining '
-                'attempts: {1}'.format(
-                    name, attempts
-                )
-            )
+    while True:
+        vm_id = _get_pool_id('vmpool', name, -1, -1, -1, -1)
+        if vm_id is not None:
+            server, auth = _get_xml_rpc()
+            response = server.one.vm.info(auth, int(vm_id))
+            if response[0]:
+                return _xml_to_dict(_parse_xml(response[1]))
 
-            # Just a little delay between attempts...
-            time.sleep(0.5)
+        if attempts <= 0:
+            return {}
 
-    return {}
+        attempts -= 1
+        log.debug(
+            'Failed to get the data for node \'%s\'. Remaining '
+            'attempts: %s', name, attempts
+        )
+
+        # Back off between attempts, with some jitter so that parallel
+        # salt-cloud runs don't all poll the frontend at the same moment.
+        time.sleep(delay * (0.5 + random.random()))
+        delay *= 2
+
+
+def _get_pool(pool, *args):
+    '''
+    Helper function that queries an OpenNebula pool and returns a dictionary of
+    the pool's elements, keyed by name. Results are cached for ``pool_cache_ttl``
+    seconds.
+
+    The returned dictionary is the cached one and may be stale, so it is only
+    meant for resolving names and IDs within this module. Use ``_query_pool``
+    for anything returned to the caller.
+
+    pool
+        The name of the pool to query, such as ``imagepool`` or ``hostpool``.
+
+    args
+        Any additional arguments to pass to the pool's ``info`` call.
+    '''
+    elements = _get_cached_pool(pool)
+    if elements is not None:
+        return elements
+
+    response = _fetch_pool((pool,) + args)[1]
+
+    return _cache_pool(pool, response)
+
+
+def _get_pool_element(pool, elements, value):
+    '''
+    Helper function that looks up an element of an OpenNebula pool by either
+    its name or its ID. Returns ``None`` if no element matches.
+
+    pool
+        The name of the pool, such as ``imagepool``.
+
+    elements
+        The dictionary of the pool's elements, keyed by name, as returned by
+        ``_get_pool``.
+
+    value
+        The name or ID of the element to look up.
+    '''
+    element = elements.get(value)
+    if element is not None:
+        return element
+
+    cached = _POOL_CACHE.get((__active_provider_name__, pool))
+    if cached is not None and cached[1] is elements:
+        ids = cached[2]
+    else:
+        ids = dict(
+            (element['id'], element) for element in six.itervalues(elements)
+        )
+
+    return ids.get(value)
+
+
+def _get_pool_cache_ttl():
+    '''
+    Helper function that returns the number of seconds for which pools are
+    cached, as set by ``pool_cache_ttl`` in the provider configuration.
+    '''
+    return config.get_cloud_config_value(
+        'pool_cache_ttl', get_configured_provider(), __opts__,
+        search_global=False, default=30
+    )
+
+
+def _get_pool_id(pool, name, *args):
+    '''
+    Helper function that returns the ID of the named element of an OpenNebula
+    pool, or ``None`` if there is no such element. If the pool isn't cached,
+    the pool is scanned without converting any of the pool's elements to
+    dictionaries.
+
+    If several elements share the name, the last one in the pool wins, as it
+    does in the cached pool (see ``_cache_pool``).
+
+    pool
+        The name of the pool to query, such as ``vmpool``.
+
+    name
+        The name of the element.
+
+    args
+        Any additional arguments to pass to the pool's ``info`` call.
+    '''
+    elements = _get_cached_pool(pool)
+    if elements is not None:
+        return elements[name]['id'] if name in elements else None
+
+    ret = None
+    response = _fetch_pool((pool,) + args)[1]
+    for element in _iter_pool(response, _POOL_ELEMENTS[pool]):
+        if _XPATH_NAME(element) == name:
+            ret = _XPATH_ID(element)
+
+    return ret
 
 
 def _get_xml_rpc():
@@ -4331,26 +4475,70 @@ def _get_xml_rpc():
     Uses the OpenNebula cloud provider configurations to connect to the
     OpenNebula API.
 
-    Returns the server connection created as well as the user and password
-    values from the cloud provider config file used to make the connection.
+    Returns the server connection as well as the ``user:password``
+    authentication string, built from the cloud provider config file, to pass
+    to each API call. The connection and the settings it is built from are
+    looked up on first use and reused afterwards.
     '''
-    vm_ = get_configured_provider()
+    provider = __active_provider_name__ or __virtualname__
+    cached = _XML_RPC_CONFIG.get(provider)
+    if cached is not None and cached[0] is __opts__:
+        xml_rpc, auth = cached[1]
+    else:
+        vm_ = get_configured_provider()
 
-    xml_rpc = config.get_cloud_config_value(
-        'xml_rpc', vm_, __opts__, search_global=False
-    )
+        xml_rpc = config.get_cloud_config_value(
+            'xml_rpc', vm_, __opts__, search_global=False
+        )
 
-    user = config.get_cloud_config_value(
-        'user', vm_, __opts__, search_global=False
-    )
+        user = config.get_cloud_config_value(
+            'user', vm_, __opts__, search_global=False
+        )
 
-    password = config.get_cloud_config_value(
-        'password', vm_, __opts__, search_global=False
-    )
+        password = config.get_cloud_config_value(
+            'password', vm_, __opts__, search_global=False
+        )
+
+        auth = ':'.join([user, password])
+        _XML_RPC_CONFIG[provider] = (__opts__, (xml_rpc, auth))
+
+    servers = _XML_RPC_SERVERS.__dict__.setdefault('servers', {})
+    server = servers.get(xml_rpc)
+    if server is None:
+        server = salt.ext.six.moves.xmlrpc_client.ServerProxy(xml_rpc)
+        servers[xml_rpc] = server
 
-    server = salt.ext.six.moves.xmlrpc_client.ServerProxy(xml_rpc)
+    return server, auth
 
-    return server, user, password
+
+def _iter_pool(xml, tag):
+    '''
+    Helper function that incrementally parses an OpenNebula pool and yields
+    each of its elements in turn. Each element is cleared once the caller is
+    done with it, so the whole pool is never held in memory at once.
+
+    Only the pool's direct children are yielded. Elements deeper in the tree
+    that happen to share the tag, such as a user-defined ``VM`` attribute in a
+    VM's ``USER_TEMPLATE``, are left alone as part of their pool element.
+
+    xml
+        The xml data of the pool.
+
+    tag
+        The tag of the pool's elements, such as ``IMAGE`` or ``VM``.
+    '''
+    if isinstance(xml, six.text_type):
+        xml = xml.encode('utf-8')
+
+    for _, element in etree.iterparse(BytesIO(xml), events=('end',), tag=tag):
+        parent = element.getparent()
+        if parent is None or parent.getparent() is not None:
+            continue
+
+        yield element
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
 
 
 def _list_nodes(full=False):
@@ -4362,57 +4550,200 @@ def _list_nodes(full=False):
         If performing a full query, such as in list_nodes_full, change
         this parameter to ``True``.
     '''
-    server, user, password = _get_xml_rpc()
-    auth = ':'.join([user, password])
+    server, auth = _get_xml_rpc()
 
     vm_pool = server.one.vmpool.info(auth, -1, -1, -1, -1)[1]
 
     vms = {}
-    for vm in etree.XML(vm_pool):
-        name = vm.find('NAME').text
-        vms[name] = {}
+    for vm in _iter_pool(vm_pool, _POOL_ELEMENTS['vmpool']):
+        name = _XPATH_NAME(vm)
+
+        if full:
+            vms[name] = _xml_to_dict(vm)
+            continue
+
+        vms[name] = {
+            'id': _XPATH_ID(vm),
+            'image': _XPATH_TEMPLATE_ID(vm),
+            'name': name,
+            'size': {'cpu': _XPATH_CPU(vm), 'memory': _XPATH_MEMORY(vm)},
+            'state': _XPATH_STATE(vm),
+            'private_ips': _XPATH_NIC_IPS(vm),
+            'public_ips': [],
+        }
+
+    return vms
+
+
+def _parse_pool(pool, xml):
+    '''
+    Helper function that parses the xml data of an OpenNebula pool into a
+    dictionary of the pool's elements, keyed by name.
+
+    pool
+        The name of the pool, such as ``imagepool``.
+
+    xml
+        The xml data returned by the pool's ``info`` call.
+    '''
+    elements = {}
+    for element in _iter_pool(xml, _POOL_ELEMENTS[pool]):
+        elements[_XPATH_NAME(element)] = _xml_to_dict(element)
+
+    return elements
+
+
+def _parse_xml(xml):
+    '''
+    Helper function that parses the xml data of a single OpenNebula object,
+    such as the response of ``one.image.info``.
+
+    XML-RPC may hand the data over as text, which is encoded to UTF-8 bytes
+    first so lxml always parses from a byte buffer.
+
+    xml
+        The xml data to parse.
+    '''
+    if isinstance(xml, six.text_type):
+        xml = xml.encode('utf-8')
+
+    return etree.fromstring(xml)
+
+
+def _prefetch_pools(*pools):
+    '''
+    Helper function that fetches several OpenNebula pools in a single
+    ``system.multicall`` round trip and stores them in the pool cache. Pools
+    which are already cached are skipped. If the server doesn't support
+    ``system.multicall``, the pools are fetched concurrently instead. A pool
+    whose call fails within the multicall is left uncached, so that it is
+    fetched on its own when it is first used, while the other pools are still
+    cached.
+
+    pools
+        Tuples of a pool name followed by the arguments to pass to the pool's
+        ``info`` call, such as ``('imagepool', -1, -1, -1)``.
+    '''
+    if _get_pool_cache_ttl() <= 0:
+        return
+
+    pools = [pool for pool in pools if _get_cached_pool(pool[0]) is None]
+    if len(pools) < 2:
+        # Nothing to batch, the pool will be fetched when it is first used.
+        return
+
+    server, auth = _get_xml_rpc()
 
-        cpu_size = vm.find('TEMPLATE').find('CPU').text
-        memory_size = vm.find('TEMPLATE').find('MEMORY').text
+    multicall = salt.ext.six.moves.xmlrpc_client.MultiCall(server)
+    for pool in pools:
+        getattr(multicall.one, pool[0]).info(auth, *pool[1:])
 
-        private_ips = []
-        for nic in vm.find('TEMPLATE').findall('NIC'):
+    try:
+        results = multicall()
+    except salt.ext.six.moves.xmlrpc_client.Fault as exc:
+        log.debug(
+            'Unable to prefetch the OpenNebula pools with system.multicall, '
+            'fetching them concurrently instead: %s', exc
+        )
+        thread_pool = ThreadPool(len(pools))
+        try:
+            responses = thread_pool.map(_fetch_pool, pools)
+        finally:
+            thread_pool.close()
+            thread_pool.join()
+    else:
+        responses = []
+        for index, pool in enumerate(pools):
             try:
-                private_ips.append(nic.find('IP').text)
-            except Exception:
-                pass
-
-        vms[name]['id'] = vm.find('ID').text
-        vms[name]['image'] = vm.find('TEMPLATE').find('TEMPLATE_ID').text
-        vms[name]['name'] = name
-        vms[name]['size'] = {'cpu': cpu_size, 'memory': memory_size}
-        vms[name]['state'] = vm.find('STATE').text
-        vms[name]['private_ips'] = private_ips
-        vms[name]['public_ips'] = []
+                responses.append(results[index])
+            except salt.ext.six.moves.xmlrpc_client.Fault as exc:
+                log.debug(
+                    'Unable to prefetch the OpenNebula %s: %s', pool[0], exc
+                )
+                responses.append([False])
 
-        if full:
-            vms[vm.find('NAME').text] = _xml_to_dict(vm)
+    for pool, response in zip(pools, responses):
+        if response[0]:
+            _cache_pool(pool[0], response[1])
 
-    return vms
+
+def _query_pool(pool, *args):
+    '''
+    Helper function that queries an OpenNebula pool and returns a dictionary of
+    the pool's elements, keyed by name. The pool cache is neither used nor
+    updated, so the result is current and belongs to the caller.
+
+    pool
+        The name of the pool to query, such as ``imagepool`` or ``hostpool``.
+
+    args
+        Any additional arguments to pass to the pool's ``info`` call.
+    '''
+    return _parse_pool(pool, _fetch_pool((pool,) + args)[1])
+
+
+def _read_template_file(path):
+    '''
+    Helper function that returns the contents of a template file, such as the
+    one given as ``path`` to the allocate and update functions. The file is
+    read straight from its file descriptor, asking for the whole file at once,
+    and closed right away.
+
+    path
+        The path to the template file.
+    '''
+    fd_ = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        # Keep reading until EOF in case the file grew or isn't a regular file
+        # (st_size is 0 for a pipe).
+        chunks = []
+        chunk = os.read(fd_, os.fstat(fd_).st_size or DEFAULT_BUFFER_SIZE)
+        while chunk:
+            chunks.append(chunk)
+            chunk = os.read(fd_, DEFAULT_BUFFER_SIZE)
+    finally:
+        os.close(fd_)
+
+    return b''.join(chunks).decode('utf-8')
 
 
 def _xml_to_dict(xml):
     '''
     Helper function to covert xml into a data dictionary.
 
+    The tree is walked with an explicit stack of (element, dictionary) pairs
+    rather than by recursion, which saves a Python function call per nested
+    element. Only child elements are visited; lxml filters out comments and
+    processing instructions itself.
+
+    Repeated sibling tags are numbered in order, so three ``NIC`` elements
+    become the ``nic``, ``nic1`` and ``nic2`` keys.
+
     xml
         The xml data to convert.
     '''
     dicts = {}
-    for item in xml:
-        key = item.tag.lower()
-        idx = 1
-        while key in dicts:
-            key += str(idx)
-            idx += 1
-        if item.text is None:
-            dicts[key] = _xml_to_dict(item)
-        else:
-            dicts[key] = item.text
+    stack = [(xml, dicts)]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        element, parent = pop()
+        # The next suffix to try for each tag, so that numbering a run of
+        # siblings with the same tag doesn't probe every earlier key again.
+        counts = {}
+        for item in element.iterchildren(tag=etree.Element):
+            base = item.tag.lower()
+            idx = counts.get(base, 0)
+            key = base + str(idx) if idx else base
+            while key in parent:
+                idx += 1
+                key = base + str(idx)
+            counts[base] = idx + 1
+            text = item.text
+            if text is None:
+                parent[key] = child = {}
+                push((item, child))
+            else:
+                parent[key] = text
 
     return dicts
@@ -5,6 +5,8 @@
 
 # Import Python libs
 from __future__ import absolute_import
+import os
+import tempfile
 
 # Import Salt Testing Libs
 from salttesting import TestCase, skipIf
@@ -16,11 +18,39 @@ ensure_in_syspath('../../../')
 # Import Salt Libs
 from salt.cloud.clouds import opennebula
 from salt.exceptions import SaltCloudSystemExit, SaltCloudNotFound
+from salt.ext.six.moves import xmlrpc_client  # pylint: disable=E0611
 
 # Global Variables
 opennebula.__active_provider_name__ = ''
 opennebula.__opts__ = {}
 VM_NAME = 'my-vm'
+HOST_POOL = '<HOST_POOL><HOST><ID>5</ID><NAME>my-host</NAME></HOST></HOST_POOL>'
+IMAGE_POOL = '<IMAGE_POOL><IMAGE><ID>0</ID><NAME>my-image</NAME></IMAGE></IMAGE_POOL>'
+TEMPLATE_POOL = ('<VMTEMPLATE_POOL>'
+                 '<VMTEMPLATE><ID>3</ID><NAME>t</NAME></VMTEMPLATE>'
+                 '<VMTEMPLATE><ID>4</ID><NAME>t</NAME></VMTEMPLATE>'
+                 '</VMTEMPLATE_POOL>')
+VM_POOL = '<VM_POOL><VM><ID>100</ID><NAME>test-vm</NAME></VM></VM_POOL>'
+NIC_VM_POOL = ('<VM_POOL><VM><ID>100</ID><NAME>test-vm</NAME><STATE>3</STATE>'
+               '<TEMPLATE><CPU>1</CPU><MEMORY>512</MEMORY>'
+               '<TEMPLATE_ID>3</TEMPLATE_ID>'
+               '<NIC><IP>10.0.0.1</IP></NIC>'
+               '<NIC><NETWORK>private</NETWORK></NIC>'
+               '</TEMPLATE></VM></VM_POOL>')
+
+
+def _mock_server(mock_xml_rpc, **pools):
+    '''
+    Makes the patched _get_xml_rpc return a mock OpenNebula server, and returns
+    the server. Each keyword argument names a pool, such as ``imagepool``,
+    whose ``info`` call returns the given xml.
+    '''
+    server = MagicMock()
+    for pool, xml in pools.items():
+        getattr(server.one, pool).info.return_value = [True, xml, 0]
+    mock_xml_rpc.return_value = (server, 'user:password')
+
+    return server
 
 
 @skipIf(NO_MOCK, NO_MOCK_REASON)
@@ -30,6 +60,14 @@ class OpenNebulaTestCase(TestCase):
     Unit TestCase for salt.cloud.clouds.opennebula module.
     '''
 
+    def setUp(self):
+        # The pool cache is module-level, so make sure no test sees pools
+        # cached by another.
+        opennebula._POOL_CACHE.clear()
+
+    def tearDown(self):
+        opennebula._POOL_CACHE.clear()
+
     def test_avail_images_action(self):
         '''
         Tests that a SaltCloudSystemExit error is raised when trying to call
@@ -159,7 +197,7 @@ class OpenNebulaTestCase(TestCase):
                           None,
                           call='foo')
 
-    @patch('salt.cloud.clouds.opennebula.list_clusters',
+    @patch('salt.cloud.clouds.opennebula._get_cached_pool',
            MagicMock(return_value={'foo': {'id': 'bar'}}))
     def test_get_cluster_id_not_found(self):
         '''
@@ -170,7 +208,7 @@ class OpenNebulaTestCase(TestCase):
                           kwargs={'name': 'test'},
                           call='function')
 
-    @patch('salt.cloud.clouds.opennebula.list_clusters',
+    @patch('salt.cloud.clouds.opennebula._get_cached_pool',
            MagicMock(return_value={'test-cluster': {'id': '100'}}))
     def test_get_cluster_id_success(self):
         '''
@@ -199,7 +237,7 @@ class OpenNebulaTestCase(TestCase):
                           None,
                           call='foo')
 
-    @patch('salt.cloud.clouds.opennebula.list_datastores',
+    @patch('salt.cloud.clouds.opennebula._get_cached_pool',
            MagicMock(return_value={'test-datastore': {'id': '100'}}))
     def test_get_datastore_id_not_found(self):
         '''
@@ -210,7 +248,7 @@ class OpenNebulaTestCase(TestCase):
                           kwargs={'name': 'test'},
                           call='function')
 
-    @patch('salt.cloud.clouds.opennebula.list_datastores',
+    @patch('salt.cloud.clouds.opennebula._get_cached_pool',
            MagicMock(return_value={'test-datastore': {'id': '100'}}))
     def test_get_datastore_id_success(self):
         '''
@@ -239,7 +277,7 @@ class OpenNebulaTestCase(TestCase):
                           None,
                           call='foo')
 
-    @patch('salt.cloud.clouds.opennebula.avail_locations',
+    @patch('salt.cloud.clouds.opennebula._get_cached_pool',
            MagicMock(return_value={'test-host': {'id': '100'}}))
     def test_get_host_id_not_found(self):
         '''
@@ -250,7 +288,7 @@ class OpenNebulaTestCase(TestCase):
                           kwargs={'name': 'test'},
                           call='function')
 
-    @patch('salt.cloud.clouds.opennebula.avail_locations',
+    @patch('salt.cloud.clouds.opennebula._get_cached_pool',
            MagicMock(return_value={'test-host': {'id': '100'}}))
     def test_get_host_id_success(self):
         '''
@@ -261,7 +299,8 @@ class OpenNebulaTestCase(TestCase):
         self.assertEqual(opennebula.get_host_id(mock_kwargs, 'foo'),
                          mock_id)
 
-    @patch('salt.cloud.clouds.opennebula.avail_images', MagicMock(return_value={}))
+    @patch('salt.cloud.clouds.opennebula._get_cached_pool',
+           MagicMock(return_value={}))
     @patch('salt.config.get_cloud_config_value', MagicMock(return_value='foo'))
     def test_get_image_not_found(self):
         '''
@@ -269,7 +308,7 @@ class OpenNebulaTestCase(TestCase):
         '''
         self.assertRaises(SaltCloudNotFound, opennebula.get_image, 'my-vm')
 
-    @patch('salt.cloud.clouds.opennebula.avail_images',
+    @patch('salt.cloud.clouds.opennebula._get_cached_pool',
            MagicMock(return_value={'my-vm': {'name': 'my-vm', 'id': 0}}))
     @patch('salt.config.get_cloud_config_value', MagicMock(return_value='my-vm'))
     def test_get_image_success(self):
@@ -296,7 +335,7 @@ class OpenNebulaTestCase(TestCase):
                           None,
                           call='foo')
 
-    @patch('salt.cloud.clouds.opennebula.avail_images',
+    @patch('salt.cloud.clouds.opennebula._get_cached_pool',
            MagicMock(return_value={'test-image': {'id': '100'}}))
     def test_get_image_id_not_found(self):
         '''
@@ -307,7 +346,7 @@ class OpenNebulaTestCase(TestCase):
                           kwargs={'name': 'test'},
                           call='function')
 
-    @patch('salt.cloud.clouds.opennebula.avail_images',
+    @patch('salt.cloud.clouds.opennebula._get_cached_pool',
            MagicMock(return_value={'test-image': {'id': '100'}}))
     def test_get_image_id_success(self):
         '''
@@ -318,7 +357,8 @@ class OpenNebulaTestCase(TestCase):
         self.assertEqual(opennebula.get_image_id(mock_kwargs, 'foo'),
                          mock_id)
 
-    @patch('salt.cloud.clouds.opennebula.avail_locations', MagicMock(return_value={}))
+    @patch('salt.cloud.clouds.opennebula._get_cached_pool',
+           MagicMock(return_value={}))
     @patch('salt.config.get_cloud_config_value', MagicMock(return_value='foo'))
     def test_get_location_not_found(self):
         '''
@@ -326,7 +366,7 @@ class OpenNebulaTestCase(TestCase):
         '''
         self.assertRaises(SaltCloudNotFound, opennebula.get_location, 'my-vm')
 
-    @patch('salt.cloud.clouds.opennebula.avail_locations',
+    @patch('salt.cloud.clouds.opennebula._get_cached_pool',
            MagicMock(return_value={'my-host': {'name': 'my-host', 'id': 0}}))
     @patch('salt.config.get_cloud_config_value', MagicMock(return_value='my-host'))
     def test_get_location_success(self):
@@ -353,7 +393,7 @@ class OpenNebulaTestCase(TestCase):
                           None,
                           call='foo')
 
-    @patch('salt.cloud.clouds.opennebula.list_security_groups',
+    @patch('salt.cloud.clouds.opennebula._get_cached_pool',
            MagicMock(return_value={'test-security-group': {'id': '100'}}))
     def test_get_secgroup_id_not_found(self):
         '''
@@ -364,7 +404,7 @@ class OpenNebulaTestCase(TestCase):
                           kwargs={'name': 'test'},
                           call='function')
 
-    @patch('salt.cloud.clouds.opennebula.list_security_groups',
+    @patch('salt.cloud.clouds.opennebula._get_cached_pool',
            MagicMock(return_value={'test-secgroup': {'id': '100'}}))
     def test_get_secgroup_id_success(self):
         '''
@@ -393,7 +433,7 @@ class OpenNebulaTestCase(TestCase):
                           None,
                           call='foo')
 
-    @patch('salt.cloud.clouds.opennebula.list_templates',
+    @patch('salt.cloud.clouds.opennebula._get_cached_pool',
            MagicMock(return_value={'test-template': {'id': '100'}}))
     def test_get_template_id_not_found(self):
         '''
@@ -404,7 +444,7 @@ class OpenNebulaTestCase(TestCase):
                           kwargs={'name': 'test'},
                           call='function')
 
-    @patch('salt.cloud.clouds.opennebula.list_templates',
+    @patch('salt.cloud.clouds.opennebula._get_cached_pool',
            MagicMock(return_value={'test-template': {'id': '100'}}))
     def test_get_template_id_success(self):
         '''
@@ -433,8 +473,11 @@ class OpenNebulaTestCase(TestCase):
                           None,
                           call='foo')
 
-    @patch('salt.cloud.clouds.opennebula.list_nodes',
-           MagicMock(return_value={'test-vm': {'id': '100'}}))
+    @skipIf(opennebula.HAS_XML_LIBS is False, 'lxml is not installed')
+    @patch('salt.cloud.clouds.opennebula._get_cached_pool',
+           MagicMock(return_value=None))
+    @patch('salt.cloud.clouds.opennebula._fetch_pool',
+           MagicMock(return_value=[True, VM_POOL, 0]))
     def test_get_vm_id_not_found(self):
         '''
         Tests that a SaltCloudSystemExit is raised when no name is provided.
@@ -444,8 +487,11 @@ class OpenNebulaTestCase(TestCase):
                           kwargs={'name': 'test'},
                           call='function')
 
-    @patch('salt.cloud.clouds.opennebula.list_nodes',
-           MagicMock(return_value={'test-vm': {'id': '100'}}))
+    @skipIf(opennebula.HAS_XML_LIBS is False, 'lxml is not installed')
+    @patch('salt.cloud.clouds.opennebula._get_cached_pool',
+           MagicMock(return_value=None))
+    @patch('salt.cloud.clouds.opennebula._fetch_pool',
+           MagicMock(return_value=[True, VM_POOL, 0]))
     def test_get_vm_id_success(self):
         '''
         Tests that the function returns successfully.
@@ -473,7 +519,7 @@ class OpenNebulaTestCase(TestCase):
                           None,
                           call='foo')
 
-    @patch('salt.cloud.clouds.opennebula.list_vns',
+    @patch('salt.cloud.clouds.opennebula._get_cached_pool',
            MagicMock(return_value={'test-vn': {'id': '100'}}))
     def test_get_vn_id_not_found(self):
         '''
@@ -484,7 +530,7 @@ class OpenNebulaTestCase(TestCase):
                           kwargs={'name': 'test'},
                           call='function')
 
-    @patch('salt.cloud.clouds.opennebula.list_vns',
+    @patch('salt.cloud.clouds.opennebula._get_cached_pool',
            MagicMock(return_value={'test-vn': {'id': '100'}}))
     def test_get_vn_id_success(self):
         '''
@@ -497,6 +543,56 @@ class OpenNebulaTestCase(TestCase):
 
     # TODO: Write tests for create function
 
+    @skipIf(opennebula.HAS_XML_LIBS is False, 'lxml is not installed')
+    @patch.dict(opennebula.__opts__, {'transport': 'zeromq'})
+    @patch('salt.config.get_cloud_config_value', MagicMock(return_value=None))
+    @patch('salt.cloud.clouds.opennebula._prefetch_pools', MagicMock())
+    @patch('salt.cloud.clouds.opennebula.get_template',
+           MagicMock(return_value='3'))
+    @patch('salt.cloud.clouds.opennebula.get_location',
+           MagicMock(return_value=None))
+    @patch('salt.utils.cloud.fire_event', MagicMock())
+    @patch('salt.utils.cloud.bootstrap', MagicMock(return_value={}))
+    @patch('salt.utils.cloud.cache_node')
+    @patch('salt.utils.cloud.wait_for_ip')
+    @patch('salt.cloud.clouds.opennebula._get_xml_rpc')
+    def test_create_query_node_data(self, mock_xml_rpc, mock_wait_for_ip,
+                                    mock_cache_node):
+        '''
+        Tests that create polls only the new VM's info while waiting for it to
+        run, and caches the node once it is running.
+        '''
+        server = _mock_server(mock_xml_rpc)
+        server.one.template.instantiate.return_value = [True, 42, 0]
+        mock_wait_for_ip.return_value = {'id': '42',
+                                         'state': '3',
+                                         'template': {'memory': '512',
+                                                      'nic': {'ip': '10.0.0.1'}}}
+        opennebula.create({'name': VM_NAME,
+                           'profile': None,
+                           'driver': 'opennebula',
+                           'image': 'my-image'})
+
+        query_node_data = mock_wait_for_ip.call_args[0][0]
+        self.assertEqual(mock_wait_for_ip.call_args[1]['update_args'], (42,))
+
+        vm_xml = ('<VM><ID>42</ID><NAME>my-vm</NAME><STATE>{0}</STATE>'
+                  '<LCM_STATE>{1}</LCM_STATE></VM>')
+        server.one.vm.info.return_value = [True, vm_xml.format(7, 0), 0]
+        self.assertIs(query_node_data(42), False)
+        server.one.vm.info.assert_called_with('user:password', 42)
+
+        server.one.vm.info.return_value = [True, vm_xml.format(3, 2), 0]
+        self.assertIsNone(query_node_data(42))
+        self.assertFalse(mock_cache_node.called)
+
+        server.one.vm.info.return_value = [True, vm_xml.format(3, 3), 0]
+        node_data = {'id': '42', 'name': 'my-vm', 'state': '3', 'lcm_state': '3'}
+        self.assertEqual(query_node_data(42), node_data)
+        mock_cache_node.assert_called_once_with(
+            node_data, opennebula.__active_provider_name__, opennebula.__opts__
+        )
+
     def test_destroy_function_error(self):
         '''
         Tests that a SaltCloudSystemExit is raised when --function or -f is provided.
@@ -595,6 +691,28 @@ class OpenNebulaTestCase(TestCase):
         '''
         self.assertRaises(SaltCloudSystemExit, opennebula.image_info, 'function')
 
+    @skipIf(opennebula.HAS_XML_LIBS is False, 'lxml is not installed')
+    @patch('salt.cloud.clouds.opennebula.get_image_id',
+           MagicMock(return_value='0'))
+    @patch('salt.cloud.clouds.opennebula._get_xml_rpc')
+    def test_image_info_by_name(self, mock_xml_rpc):
+        '''
+        Tests that image_info queries the image itself when given a name, so
+        that its state is current.
+        '''
+        server = _mock_server(mock_xml_rpc)
+        server.one.image.info.return_value = [
+            True,
+            '<IMAGE><ID>0</ID><NAME>my-image</NAME><STATE>1</STATE></IMAGE>',
+            0
+        ]
+        ret = opennebula.image_info('function', {'name': 'my-image'})
+
+        server.one.image.info.assert_called_once_with('user:password', 0)
+        self.assertEqual(ret, {'my-image': {'id': '0',
+                                            'name': 'my-image',
+                                            'state': '1'}})
+
     def test_image_persist_function_error(self):
         '''
         Tests that a SaltCloudSystemExit is raised when something other than
@@ -1494,6 +1612,25 @@ class OpenNebulaTestCase(TestCase):
                           call='function',
                           kwargs=None)
 
+    @patch('salt.cloud.clouds.opennebula.get_vn_id',
+           MagicMock(return_value='100'))
+    @patch('salt.cloud.clouds.opennebula._get_xml_rpc')
+    def test_vn_delete_success(self, mock_xml_rpc):
+        '''
+        Tests that vn_delete deletes the virtual network, and not an image, with
+        the ID looked up from the given name.
+        '''
+        server = _mock_server(mock_xml_rpc)
+        server.one.vn.delete.return_value = [True, 100, 0]
+        ret = opennebula.vn_delete(call='function', kwargs={'name': 'test-vn'})
+
+        server.one.vn.delete.assert_called_once_with('user:password', 100)
+        self.assertFalse(server.one.image.delete.called)
+        self.assertEqual(ret, {'action': 'vn.delete',
+                               'deleted': True,
+                               'vn_id': 100,
+                               'error_code': 0})
+
     def test_vn_free_ar_function_error(self):
         '''
         Tests that a SaltCloudSystemExit is raised when something other than
@@ -1628,6 +1765,284 @@ class OpenNebulaTestCase(TestCase):
                           call='function',
                           kwargs={'vn_id': '0'})
 
+    @skipIf(opennebula.HAS_XML_LIBS is False, 'lxml is not installed')
+    @patch('salt.cloud.clouds.opennebula.get_configured_provider',
+           MagicMock(return_value=False))
+    @patch('salt.cloud.clouds.opennebula._get_xml_rpc')
+    def test_get_pool_cache(self, mock_xml_rpc):
+        '''
+        Tests that a pool is only queried once while its cache entry is fresh,
+        and is queried again once the cache entry has been cleared.
+        '''
+        server = _mock_server(mock_xml_rpc, imagepool=IMAGE_POOL)
+        expected = {'my-image': {'id': '0', 'name': 'my-image'}}
+        self.assertEqual(opennebula._get_pool('imagepool', -1, -1, -1), expected)
+        self.assertEqual(opennebula._get_pool('imagepool', -1, -1, -1), expected)
+        self.assertEqual(server.one.imagepool.info.call_count, 1)
+
+        opennebula._clear_pool_cache('imagepool')
+        opennebula._get_pool('imagepool', -1, -1, -1)
+        self.assertEqual(server.one.imagepool.info.call_count, 2)
+
+    @skipIf(opennebula.HAS_XML_LIBS is False, 'lxml is not installed')
+    @patch('salt.cloud.clouds.opennebula.get_configured_provider',
+           MagicMock(return_value=False))
+    @patch('salt.cloud.clouds.opennebula._get_xml_rpc')
+    def test_avail_images_bypasses_pool_cache(self, mock_xml_rpc):
+        '''
+        Tests that avail_images always queries the pool, and neither returns
+        nor updates the cached pool.
+        '''
+        server = _mock_server(mock_xml_rpc, imagepool=IMAGE_POOL)
+        cached = opennebula._get_pool('imagepool', -1, -1, -1)
+
+        images = opennebula.avail_images()
+        self.assertEqual(images, cached)
+        self.assertIsNot(images, cached)
+        self.assertEqual(server.one.imagepool.info.call_count, 2)
+
+        images['my-image']['id'] = '1'
+        self.assertEqual(opennebula.get_image_id({'name': 'my-image'}), '0')
+        self.assertEqual(server.one.imagepool.info.call_count, 2)
+
+    @skipIf(opennebula.HAS_XML_LIBS is False, 'lxml is not installed')
+    @patch('salt.cloud.clouds.opennebula.get_configured_provider',
+           MagicMock(return_value=False))
+    @patch('salt.cloud.clouds.opennebula._get_xml_rpc')
+    def test_get_pool_nested_tag(self, mock_xml_rpc):
+        '''
+        Tests that an element nested inside a pool element is not mistaken for
+        a pool element when it shares the pool's tag.
+        '''
+        _mock_server(
+            mock_xml_rpc,
+            imagepool='<IMAGE_POOL><IMAGE><ID>0</ID><NAME>my-image</NAME>'
+                      '<TEMPLATE><IMAGE>base</IMAGE></TEMPLATE></IMAGE>'
+                      '<IMAGE><ID>1</ID><NAME>other-image</NAME></IMAGE>'
+                      '</IMAGE_POOL>'
+        )
+        expected = {
+            'my-image': {'id': '0',
+                         'name': 'my-image',
+                         'template': {'image': 'base'}},
+            'other-image': {'id': '1', 'name': 'other-image'},
+        }
+        self.assertEqual(opennebula._get_pool('imagepool', -1, -1, -1), expected)
+
+    @skipIf(opennebula.HAS_XML_LIBS is False, 'lxml is not installed')
+    @patch('salt.cloud.clouds.opennebula.get_configured_provider',
+           MagicMock(return_value=False))
+    @patch('salt.cloud.clouds.opennebula._get_xml_rpc')
+    def test_get_pool_id_duplicate_names(self, mock_xml_rpc):
+        '''
+        Tests that _get_pool_id returns the last of several elements sharing a
+        name, both when scanning the pool and when reading it from the cache.
+        '''
+        server = _mock_server(mock_xml_rpc, templatepool=TEMPLATE_POOL)
+        self.assertEqual(
+            opennebula._get_pool_id('templatepool', 't', -1, -1, -1), '4'
+        )
+
+        opennebula._get_pool('templatepool', -1, -1, -1)
+        self.assertEqual(
+            opennebula._get_pool_id('templatepool', 't', -1, -1, -1), '4'
+        )
+        # The second lookup was answered from the cache.
+        self.assertEqual(server.one.templatepool.info.call_count, 2)
+
+    @skipIf(opennebula.HAS_XML_LIBS is False, 'lxml is not installed')
+    @patch('salt.cloud.clouds.opennebula.get_configured_provider',
+           MagicMock(return_value=False))
+    @patch('salt.cloud.clouds.opennebula._get_xml_rpc')
+    def test_prefetch_pools(self, mock_xml_rpc):
+        '''
+        Tests that _prefetch_pools caches several pools with a single
+        system.multicall, so that looking them up queries nothing else.
+        '''
+        server = _mock_server(mock_xml_rpc)
+        server.system.multicall.return_value = [[[True, TEMPLATE_POOL, 0]],
+                                                [[True, HOST_POOL, 0]]]
+        opennebula._prefetch_pools(('templatepool', -1, -1, -1), ('hostpool',))
+        self.assertEqual(server.system.multicall.call_count, 1)
+
+        vm_ = {'template': 't', 'location': 'my-host'}
+        self.assertEqual(opennebula.get_template(vm_), '4')
+        self.assertEqual(opennebula.get_location(vm_), '5')
+        self.assertEqual(server.system.multicall.call_count, 1)
+        self.assertFalse(server.one.templatepool.info.called)
+        self.assertFalse(server.one.hostpool.info.called)
+
+    @patch('salt.cloud.clouds.opennebula._get_pool_cache_ttl',
+           MagicMock(return_value=0))
+    @patch('salt.cloud.clouds.opennebula._get_xml_rpc')
+    def test_prefetch_pools_cache_disabled(self, mock_xml_rpc):
+        '''
+        Tests that _prefetch_pools queries nothing when the pool cache is
+        disabled.
+        '''
+        opennebula._prefetch_pools(('templatepool', -1, -1, -1), ('hostpool',))
+        self.assertFalse(mock_xml_rpc.called)
+
+    @skipIf(opennebula.HAS_XML_LIBS is False, 'lxml is not installed')
+    @patch('salt.cloud.clouds.opennebula.get_configured_provider',
+           MagicMock(return_value=False))
+    @patch('salt.cloud.clouds.opennebula._get_xml_rpc')
+    def test_prefetch_pools_single_pool(self, mock_xml_rpc):
+        '''
+        Tests that _prefetch_pools doesn't batch a single uncached pool.
+        '''
+        server = _mock_server(mock_xml_rpc, templatepool=TEMPLATE_POOL)
+        opennebula._get_pool('templatepool', -1, -1, -1)
+        opennebula._prefetch_pools(('templatepool', -1, -1, -1), ('hostpool',))
+        self.assertFalse(server.system.multicall.called)
+        self.assertIsNone(opennebula._get_cached_pool('hostpool'))
+
+    @skipIf(opennebula.HAS_XML_LIBS is False, 'lxml is not installed')
+    @patch('salt.cloud.clouds.opennebula.get_configured_provider',
+           MagicMock(return_value=False))
+    @patch('salt.cloud.clouds.opennebula._get_xml_rpc')
+    def test_prefetch_pools_call_fault(self, mock_xml_rpc):
+        '''
+        Tests that a pool whose call fails within the multicall is left
+        uncached, while the other pools are still cached.
+        '''
+        server = _mock_server(mock_xml_rpc)
+        server.system.multicall.return_value = [
+            [[True, TEMPLATE_POOL, 0]],
+            {'faultCode': 1, 'faultString': 'Not authorized'},
+        ]
+        opennebula._prefetch_pools(('templatepool', -1, -1, -1), ('hostpool',))
+        self.assertIn('t', opennebula._get_cached_pool('templatepool'))
+        self.assertIsNone(opennebula._get_cached_pool('hostpool'))
+
+    @skipIf(opennebula.HAS_XML_LIBS is False, 'lxml is not installed')
+    @patch('salt.cloud.clouds.opennebula.get_configured_provider',
+           MagicMock(return_value=False))
+    @patch('salt.cloud.clouds.opennebula._get_xml_rpc')
+    def test_prefetch_pools_multicall_fault(self, mock_xml_rpc):
+        '''
+        Tests that _prefetch_pools fetches and caches each pool on its own when
+        the server doesn't support system.multicall.
+        '''
+        server = _mock_server(mock_xml_rpc)
+        server.system.multicall.side_effect = xmlrpc_client.Fault(
+            -32601, 'system.multicall is not supported'
+        )
+        responses = {'templatepool': [True, TEMPLATE_POOL, 0],
+                     'hostpool': [True, HOST_POOL, 0]}
+        mock_fetch = MagicMock(side_effect=lambda pool: responses[pool[0]])
+        with patch('salt.cloud.clouds.opennebula._fetch_pool', mock_fetch):
+            opennebula._prefetch_pools(('templatepool', -1, -1, -1),
+                                       ('hostpool',))
+
+        self.assertEqual(
+            sorted(call[0][0] for call in mock_fetch.call_args_list),
+            [('hostpool',), ('templatepool', -1, -1, -1)]
+        )
+        self.assertIn('t', opennebula._get_cached_pool('templatepool'))
+        self.assertIn('my-host', opennebula._get_cached_pool('hostpool'))
+
+    @skipIf(opennebula.HAS_XML_LIBS is False, 'lxml is not installed')
+    @patch('salt.cloud.clouds.opennebula.get_configured_provider',
+           MagicMock(return_value=False))
+    @patch('salt.cloud.clouds.opennebula._get_xml_rpc')
+    def test_get_node(self, mock_xml_rpc):
+        '''
+        Tests that _get_node returns the info of the named VM.
+        '''
+        server = _mock_server(mock_xml_rpc, vmpool=VM_POOL)
+        server.one.vm.info.return_value = [
+            True, '<VM><ID>100</ID><NAME>test-vm</NAME><STATE>3</STATE></VM>', 0
+        ]
+        self.assertEqual(opennebula._get_node('test-vm'),
+                         {'id': '100', 'name': 'test-vm', 'state': '3'})
+        server.one.vm.info.assert_called_once_with('user:password', 100)
+
+    @skipIf(opennebula.HAS_XML_LIBS is False, 'lxml is not installed')
+    @patch('salt.cloud.clouds.opennebula.get_configured_provider',
+           MagicMock(return_value=False))
+    @patch('time.sleep')
+    @patch('salt.cloud.clouds.opennebula._get_xml_rpc')
+    def test_get_node_not_found(self, mock_xml_rpc, mock_sleep):
+        '''
+        Tests that _get_node retries twice before returning an empty dictionary
+        when the named VM doesn't exist.
+        '''
+        server = _mock_server(mock_xml_rpc, vmpool=VM_POOL)
+        self.assertEqual(opennebula._get_node('my-vm'), {})
+        self.assertEqual(server.one.vmpool.info.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertFalse(server.one.vm.info.called)
+
+    @skipIf(opennebula.HAS_XML_LIBS is False, 'lxml is not installed')
+    @patch('salt.cloud.clouds.opennebula._get_xml_rpc')
+    def test_list_nodes(self, mock_xml_rpc):
+        '''
+        Tests that _list_nodes returns a summary of each VM, including the IPs
+        of only those NICs which have one.
+        '''
+        _mock_server(mock_xml_rpc, vmpool=NIC_VM_POOL)
+        ret = {
+            'test-vm': {'id': '100',
+                        'image': '3',
+                        'name': 'test-vm',
+                        'size': {'cpu': '1', 'memory': '512'},
+                        'state': '3',
+                        'private_ips': ['10.0.0.1'],
+                        'public_ips': []},
+        }
+        self.assertEqual(opennebula._list_nodes(), ret)
+
+    @skipIf(opennebula.HAS_XML_LIBS is False, 'lxml is not installed')
+    @patch('salt.cloud.clouds.opennebula._get_xml_rpc')
+    def test_list_nodes_full(self, mock_xml_rpc):
+        '''
+        Tests that _list_nodes returns all of each VM's data when full is True.
+        '''
+        _mock_server(mock_xml_rpc, vmpool=NIC_VM_POOL)
+        ret = {
+            'test-vm': {'id': '100',
+                        'name': 'test-vm',
+                        'state': '3',
+                        'template': {'cpu': '1',
+                                     'memory': '512',
+                                     'template_id': '3',
+                                     'nic': {'ip': '10.0.0.1'},
+                                     'nic1': {'network': 'private'}}},
+        }
+        self.assertEqual(opennebula._list_nodes(full=True), ret)
+
+    def test_read_template_file(self):
+        '''
+        Tests that _read_template_file returns the decoded contents of a file.
+        '''
+        contents = u'NAME="My Template"\nCPU="1.0"\n'
+        fd_, path = tempfile.mkstemp()
+        try:
+            os.write(fd_, contents.encode('utf-8'))
+            os.close(fd_)
+            self.assertEqual(opennebula._read_template_file(path), contents)
+        finally:
+            os.remove(path)
+
+    @skipIf(opennebula.HAS_XML_LIBS is False, 'lxml is not installed')
+    def test_xml_to_dict_repeated_tags(self):
+        '''
+        Tests that repeated sibling tags are numbered in order by _xml_to_dict.
+        '''
+        xml = opennebula._parse_xml(
+            '<VM><ID>100</ID><TEMPLATE>'
+            '<NIC><IP>10.0.0.1</IP></NIC>'
+            '<NIC><IP>10.0.0.2</IP></NIC>'
+            '<NIC><IP>10.0.0.3</IP></NIC>'
+            '</TEMPLATE></VM>'
+        )
+        ret = {'id': '100',
+               'template': {'nic': {'ip': '10.0.0.1'},
+                            'nic1': {'ip': '10.0.0.2'},
+                            'nic2': {'ip': '10.0.0.3'}}}
+        self.assertEqual(opennebula._xml_to_dict(xml), ret)
+
 
 if __name__ == '__main__':
     from integration import run_tests